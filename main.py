@@ -83,7 +83,7 @@ def main():
     if deadlock:
         print("Result: Deadlock DETECTED.")
         # Map back to place names for clearer output
-        dead_places = [pn.place_ids[i] for i, val in enumerate(deadlock) if val == 1]
+        dead_places = [pn.place_ids[i] for i, val in enumerate(deadlock) if val > 0]
         print(f"Deadlock State (Places with tokens): {dead_places}")
     else:
         print("Result: No deadlock found.")
@@ -107,14 +107,14 @@ def main():
         if cost > 0:
             print(f"  {place_id}: {cost}")
 
-    best_marking, max_value = max_reachable_marking(pn.place_ids, bdd, c)
+    best_marking, max_value = max_reachable_marking(pn.place_ids, bdd, c, pn.bounds)
 
     if best_marking is not None:
         print(f"\nOptimal marking: {best_marking}")
         print(f"Maximum value c^T M: {max_value}")
         # Show which places have tokens
         optimal_places = [
-            pn.place_ids[i] for i, val in enumerate(best_marking) if val == 1
+            pn.place_ids[i] for i, val in enumerate(best_marking) if val > 0
         ]
         print(f"Places with tokens in optimal marking: {optimal_places}")
     else:
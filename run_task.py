@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """
 Quick task runner for Mathematical Modeling Assignment
-Usage: python run_task.py <task_number> [pnml_file]
+Usage: python run_task.py <task_number> [pnml_file] [bound]
 Example: python run_task.py 1
          python run_task.py 2bfs
          python run_task.py 2dfs TestModel.pnml
+         python run_task.py 3 buffer.pnml 4   (places hold up to 4 tokens)
 """
 
 import sys
@@ -15,22 +16,23 @@ from src.PetriNet import PetriNet
 from src.BFS import bfs_reachable
 from src.DFS import dfs_reachable
 from src.BDD import bdd_reachable
+from src.Analytics import bdd_statistics
 from src.DeadLock import check_deadlock
 from src.Optimization import max_reachable_marking
 
 
-def task1(pnml_file):
+def task1(pnml_file, bound=1):
     """Task 1: Parse PNML and verify consistency"""
     print(f"\n=== Task 1: PNML Parser ===")
-    pn = PetriNet.from_pnml(pnml_file)
+    pn = PetriNet.from_pnml(pnml_file, bound)
     print(pn)
     return pn
 
 
-def task2(pnml_file, method="bfs"):
+def task2(pnml_file, method="bfs", bound=1):
     """Task 2: Explicit reachability (BFS or DFS)"""
     print(f"\n=== Task 2: Explicit Reachability ({method.upper()}) ===")
-    pn = PetriNet.from_pnml(pnml_file)
+    pn = PetriNet.from_pnml(pnml_file, bound)
 
     tracemalloc.start()
     start = time.time()
@@ -53,10 +55,10 @@ def task2(pnml_file, method="bfs"):
     return pn, markings
 
 
-def task3(pnml_file):
+def task3(pnml_file, bound=1):
     """Task 3: Symbolic BDD reachability"""
     print(f"\n=== Task 3: Symbolic BDD Reachability ===")
-    pn = PetriNet.from_pnml(pnml_file)
+    pn = PetriNet.from_pnml(pnml_file, bound)
 
     tracemalloc.start()
     start = time.time()
@@ -73,20 +75,26 @@ def task3(pnml_file):
     except AttributeError:
         pass
 
+    stats = bdd_statistics(pn, bdd)
+    print("Markings with a token, per place:")
+    for pid, marked in zip(pn.place_ids, stats.marked_counts):
+        print(f"  {pid}: {marked}/{stats.count}")
+    print(f"Token histogram (total tokens -> markings): {stats.token_histogram}")
+
     return pn, bdd, count
 
 
-def task4(pnml_file):
+def task4(pnml_file, bound=1):
     """Task 4: Deadlock detection"""
     print(f"\n=== Task 4: Deadlock Detection (ILP + BDD) ===")
-    pn = PetriNet.from_pnml(pnml_file)
+    pn = PetriNet.from_pnml(pnml_file, bound)
     bdd, _ = bdd_reachable(pn)
 
     deadlock = check_deadlock(pn, bdd)
 
     if deadlock:
         print("Result: DEADLOCK DETECTED")
-        dead_places = [pn.place_ids[i] for i, val in enumerate(deadlock) if val == 1]
+        dead_places = [pn.place_ids[i] for i, val in enumerate(deadlock) if val > 0]
         print(f"Deadlock marking: {deadlock}")
         print(f"Places with tokens: {dead_places}")
     else:
@@ -95,10 +103,10 @@ def task4(pnml_file):
     return pn, deadlock
 
 
-def task5(pnml_file):
+def task5(pnml_file, bound=1):
     """Task 5: Optimization over reachable markings"""
     print(f"\n=== Task 5: Optimization (Maximize c^T M) ===")
-    pn = PetriNet.from_pnml(pnml_file)
+    pn = PetriNet.from_pnml(pnml_file, bound)
     bdd, _ = bdd_reachable(pn)
 
     # Define cost vector - prioritize running states
@@ -116,12 +124,12 @@ def task5(pnml_file):
         if cost > 0:
             print(f"  {pid}: {cost}")
 
-    marking, value = max_reachable_marking(pn.place_ids, bdd, c)
+    marking, value = max_reachable_marking(pn.place_ids, bdd, c, pn.bounds)
 
     if marking:
         print(f"\nOptimal marking: {marking}")
         print(f"Maximum value: {value}")
-        opt_places = [pn.place_ids[i] for i, val in enumerate(marking) if val == 1]
+        opt_places = [pn.place_ids[i] for i, val in enumerate(marking) if val > 0]
         print(f"Places with tokens: {opt_places}")
     else:
         print("No reachable marking found")
@@ -143,16 +151,17 @@ def main():
 
     task = sys.argv[1].lower()
     pnml_file = sys.argv[2] if len(sys.argv) > 2 else "TestModel.pnml"
+    bound = int(sys.argv[3]) if len(sys.argv) > 3 else 1
 
     print(f"Using PNML file: {pnml_file}")
 
     tasks = {
-        "1": lambda: task1(pnml_file),
-        "2bfs": lambda: task2(pnml_file, "bfs"),
-        "2dfs": lambda: task2(pnml_file, "dfs"),
-        "3": lambda: task3(pnml_file),
-        "4": lambda: task4(pnml_file),
-        "5": lambda: task5(pnml_file),
+        "1": lambda: task1(pnml_file, bound),
+        "2bfs": lambda: task2(pnml_file, "bfs", bound),
+        "2dfs": lambda: task2(pnml_file, "dfs", bound),
+        "3": lambda: task3(pnml_file, bound),
+        "4": lambda: task4(pnml_file, bound),
+        "5": lambda: task5(pnml_file, bound),
     }
 
     if task in tasks:
@@ -0,0 +1,212 @@
+from typing import Dict, List, Optional
+import numpy as np
+from pyeda.boolalg.bdd import BDDNODEONE, BDDNODEZERO
+from pyeda.inter import BinaryDecisionDiagram
+from src.Encoding import place_bdd_vars
+from src.PetriNet import PetriNet
+
+
+class ReachableStatistics:
+    """
+    Exact statistics of a set of markings (Python ints, no overflow):
+      count            number of markings
+      marked_counts[p] number of markings where place p holds >= 1 token
+      token_histogram  token_histogram[n] = number of markings with n tokens
+    """
+
+    def __init__(self, count: int, marked_counts: List[int], token_histogram: List[int]):
+        self.count = count
+        self.marked_counts = marked_counts
+        self.token_histogram = token_histogram
+
+    def __str__(self) -> str:
+        s = [f"Markings: {self.count}"]
+        s.append("Marked counts per place: " + str(self.marked_counts))
+        s.append("Token histogram: " + str(self.token_histogram))
+        return "\n".join(s)
+
+
+class _Encoding:
+    """BDD levels of the place encoding, ordered as pyeda orders variables."""
+
+    def __init__(self, pn: PetriNet):
+        entries = []
+        for p_idx, bits in enumerate(place_bdd_vars(pn)):
+            for j, var in enumerate(bits):
+                entries.append((var.uniqid, p_idx, 1 << j))
+        entries.sort()
+
+        self.num_places = len(pn.place_ids)
+        self.num_levels = len(entries)
+        self.level_of = {uniqid: level for level, (uniqid, _, _) in enumerate(entries)}
+        self.place_of = [p_idx for _, p_idx, _ in entries]
+        self.weight_of = [weight for _, _, weight in entries]
+
+        # bits_before[l, p]: how many of place p's bits sit above level l
+        self.bits_before = np.zeros((self.num_levels + 1, self.num_places), dtype=np.int64)
+        for level, p_idx in enumerate(self.place_of):
+            self.bits_before[level + 1] = self.bits_before[level]
+            self.bits_before[level + 1, p_idx] += 1
+
+    def level(self, node) -> int:
+        if node is BDDNODEONE or node is BDDNODEZERO:
+            return self.num_levels
+        try:
+            return self.level_of[node.root]
+        except KeyError:
+            raise ValueError(
+                "BDD depends on a variable outside the place encoding of this net"
+            ) from None
+
+
+def _shift_add(hist: List[int], weight: int) -> List[int]:
+    """Multiply the token polynomial by (1 + x^weight)."""
+    result = hist + [0] * weight
+    for n, c in enumerate(hist):
+        result[n + weight] += c
+    return result
+
+
+def _lift(enc: _Encoding, value, level: int, target: int):
+    """
+    Account for the levels target..level-1 that an edge skips: each skipped
+    bit is a don't-care, so it doubles the count and spreads the histogram.
+    """
+    if value is None or level == target:
+        return value
+    count, zeros, hist = value
+
+    skipped = level - target
+    skipped_per_place = enc.bits_before[level] - enc.bits_before[target]
+    factors = np.array([1 << int(skipped - k) for k in skipped_per_place], dtype=object)
+    # A skipped bit of place q keeps "q is empty" only when it is 0
+    zeros = zeros * factors
+    count = count << skipped
+    for l in range(target, level):
+        hist = _shift_add(hist, enc.weight_of[l])
+    return count, zeros, hist
+
+
+def bdd_statistics(
+    pn: PetriNet,
+    bdd: BinaryDecisionDiagram,
+    predicate: Optional[BinaryDecisionDiagram] = None,
+) -> ReachableStatistics:
+    """
+    Count, per-place marked counts and token histogram of the markings
+    encoded by `bdd` (optionally restricted to `predicate`), computed in one
+    memoized bottom-up pass over the BDD nodes, without enumerating markings.
+
+    Unlike BinaryDecisionDiagram.satisfy_count(), which counts the cubes
+    returned by satisfy_all(), every don't-care bit is expanded, so the
+    result is the number of full markings.
+
+    Cost: every node is visited once, but each one carries a per-place
+    vector (P entries) and a histogram of up to H = sum(bounds) + 1 entries,
+    and each edge spreads the histogram once per level it skips (at most L,
+    the number of bit variables). Worst case O(dag_size * (P + L * H))
+    big-int operations: linear in the BDD size for a fixed net, not overall.
+    """
+    if predicate is not None:
+        bdd = bdd & predicate
+
+    enc = _Encoding(pn)
+    one = (1, np.ones(enc.num_places, dtype=object), [1])
+
+    # Post-order over the DAG with an explicit stack; values over levels >= level(node)
+    values: Dict[int, object] = {}
+    stack = [bdd.node]
+    while stack:
+        node = stack[-1]
+        if id(node) in values:
+            stack.pop()
+            continue
+        if node is BDDNODEZERO:
+            values[id(node)] = None
+            stack.pop()
+            continue
+        if node is BDDNODEONE:
+            values[id(node)] = one
+            stack.pop()
+            continue
+
+        pending = [child for child in (node.lo, node.hi) if id(child) not in values]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+
+        level = enc.level(node)
+        p_idx, weight = enc.place_of[level], enc.weight_of[level]
+        lo = _lift(enc, values[id(node.lo)], enc.level(node.lo), level + 1)
+        hi = _lift(enc, values[id(node.hi)], enc.level(node.hi), level + 1)
+
+        if lo is None and hi is None:
+            values[id(node)] = None
+            continue
+        if lo is None:
+            lo = (0, np.zeros(enc.num_places, dtype=object), [0])
+        if hi is None:
+            hi = (0, np.zeros(enc.num_places, dtype=object), [0])
+
+        count = lo[0] + hi[0]
+        zeros = lo[1] + hi[1]
+        # Bit set on the hi branch: place p is not empty there
+        zeros[p_idx] = lo[1][p_idx]
+        hi_hist = [0] * weight + hi[2]
+        size = max(len(lo[2]), len(hi_hist))
+        hist = [
+            (lo[2][n] if n < len(lo[2]) else 0) + (hi_hist[n] if n < len(hi_hist) else 0)
+            for n in range(size)
+        ]
+        values[id(node)] = (count, zeros, hist)
+
+    root = _lift(enc, values[id(bdd.node)], enc.level(bdd.node), 0)
+    if root is None:
+        return ReachableStatistics(0, [0] * enc.num_places, [])
+
+    count, zeros, hist = root
+    while len(hist) > 1 and hist[-1] == 0:
+        hist.pop()
+    return ReachableStatistics(
+        count, [int(count - z) for z in zeros], [int(c) for c in hist]
+    )
+
+
+def count_markings(
+    pn: PetriNet,
+    bdd: BinaryDecisionDiagram,
+    predicate: Optional[BinaryDecisionDiagram] = None,
+) -> int:
+    """
+    Exact number of markings in `bdd` (and `predicate`, if given).
+
+    Count-only version of the bdd_statistics pass: one integer per node,
+    doubled once per level an edge skips, so O(dag_size) big-int operations.
+    """
+    if predicate is not None:
+        bdd = bdd & predicate
+
+    enc = _Encoding(pn)
+
+    # Post-order over the DAG; counts over levels >= level(node)
+    counts: Dict[int, int] = {id(BDDNODEZERO): 0, id(BDDNODEONE): 1}
+    stack = [bdd.node]
+    while stack:
+        node = stack[-1]
+        if id(node) in counts:
+            stack.pop()
+            continue
+
+        pending = [child for child in (node.lo, node.hi) if id(child) not in counts]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+
+        below = enc.level(node) + 1
+        counts[id(node)] = (counts[id(node.lo)] << (enc.level(node.lo) - below)) + (
+            counts[id(node.hi)] << (enc.level(node.hi) - below)
+        )
+
+    return counts[id(bdd.node)] << enc.level(bdd.node)
@@ -1,55 +1,142 @@
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import numpy as np
 from pyeda.boolalg.bdd import BDDONE, BDDZERO
-from pyeda.inter import BinaryDecisionDiagram, bddvar
-from src.PetriNet import PetriNet
+from pyeda.inter import BinaryDecisionDiagram
+from src.Analytics import count_markings
+from src.Encoding import flatten_bits, marking_bdd, place_bdd_vars
+from src.PetriNet import BoundExceededError, NetDiff, PetriNet
 
 
-def _initial_state_bdd(
-    place_vars, initial_marking: np.ndarray
+def _add_const(bits, const: int, width: int) -> List[BinaryDecisionDiagram]:
+    """Ripple-carry adder: bit vector `bits` + constant, on `width` bits."""
+    result = []
+    carry = BDDZERO
+    for j in range(width):
+        a = bits[j] if j < len(bits) else BDDZERO
+        b = BDDONE if (const >> j) & 1 else BDDZERO
+        result.append(a ^ b ^ carry)
+        carry = (a & b) | (carry & (a ^ b))
+    return result
+
+
+def _equal(a_bits, b_bits) -> BinaryDecisionDiagram:
+    """a == b for two bit vectors of the same width."""
+    eq = BDDONE
+    for a, b in zip(a_bits, b_bits):
+        eq &= ~(a ^ b)
+    return eq
+
+
+def _geq_const(bits, const: int) -> BinaryDecisionDiagram:
+    """bits >= const (unsigned), built from the least significant bit up."""
+    if const >> len(bits):
+        return BDDZERO
+    geq = BDDONE
+    for j, bit in enumerate(bits):
+        geq = (bit & geq) if (const >> j) & 1 else (bit | geq)
+    return geq
+
+
+def build_transition_relations(
+    pn: PetriNet, place_bits, next_place_bits
+) -> List[BinaryDecisionDiagram]:
+    """
+    Build one relation R_t(X, X') per transition
+    following Pastor-Cortadella symbolic construction.
+    """
+    return [
+        build_single_relation(pn, t_idx, place_bits, next_place_bits)
+        for t_idx in range(pn.I.shape[0])
+    ]
+
+
+def build_single_relation(
+    pn: PetriNet, t_idx: int, place_bits, next_place_bits
 ) -> BinaryDecisionDiagram:
-    """Characteristic function of the initial marking."""
-    state = BDDONE
-    for var, value in zip(place_vars, initial_marking):
-        state &= var if value else ~var
-    return state
+    """
+    Relation R_t(X, X') of transition t_idx. For every place with weights
+    i = I[t, p], o = O[t, p]:
+      enabling   X_p >= i
+      update     X'_p + i == X_p + o   (two constant adders, no underflow)
+      bound      X'_p <= bounds[p]     (only if the bit width allows more)
+    """
+    relation = BDDONE
+
+    for p_idx in range(pn.I.shape[1]):
+        bits, next_bits = place_bits[p_idx], next_place_bits[p_idx]
+        consumed = int(pn.I[t_idx, p_idx])
+        produced = int(pn.O[t_idx, p_idx])
+
+        # Untouched place: copy the bits
+        if consumed == 0 and produced == 0:
+            relation &= _equal(next_bits, bits)
+            continue
+
+        relation &= _geq_const(bits, consumed)
+
+        width = max(len(bits), consumed.bit_length(), produced.bit_length()) + 1
+        relation &= _equal(
+            _add_const(next_bits, consumed, width),
+            _add_const(bits, produced, width),
+        )
+
+        # Keeps X' inside the encoding; reaching this clause from a reachable
+        # marking is reported as an error through build_overflow_condition
+        bound = int(pn.bounds[p_idx])
+        if bound < (1 << len(next_bits)) - 1:
+            relation &= ~_geq_const(next_bits, bound + 1)
 
+    return relation
 
-def _build_transition_relation(
-    pn: PetriNet, place_vars, next_place_vars
+
+def build_overflow_condition(
+    pn: PetriNet, t_idx: int, place_bits
 ) -> BinaryDecisionDiagram:
     """
-    Build the global transition relation R(X, X')
-    following Pastor-Cortadella symbolic construction.
+    Markings X where transition t_idx is enabled but firing it would exceed
+    a place bound: X_p >= I[t, p] for all p, and X_p + O[t, p] >= bounds[p]
+    + 1 + I[t, p] for some p.
     """
-    transitions = []
-    num_transitions, num_places = pn.I.shape
-
-    for t_idx in range(num_transitions):
-        relation = BDDONE
-
-        # Enabling condition: all preset places marked (1-safe assumption)
-        for p_idx in range(num_places):
-            if pn.I[t_idx, p_idx] > 0:
-                relation &= place_vars[p_idx]
-            # 1-safe guard: cannot place a token where one already exists unless it is consumed
-            if pn.O[t_idx, p_idx] > 0 and pn.I[t_idx, p_idx] == 0:
-                relation &= ~place_vars[p_idx]
-
-        # State update for every place
-        for p_idx in range(num_places):
-            consumes = pn.I[t_idx, p_idx] > 0
-            produces = pn.O[t_idx, p_idx] > 0
-
-            # Next value after firing: (keep token if not consumed) OR (produce token)
-            next_val = (place_vars[p_idx] if not consumes else BDDZERO) | (
-                BDDONE if produces else BDDZERO
-            )
+    enabled = BDDONE
+    exceeds = BDDZERO
+
+    for p_idx in range(pn.I.shape[1]):
+        bits = place_bits[p_idx]
+        consumed = int(pn.I[t_idx, p_idx])
+        produced = int(pn.O[t_idx, p_idx])
+
+        enabled &= _geq_const(bits, consumed)
+        if produced > consumed:
+            limit = int(pn.bounds[p_idx]) + 1 + consumed
+            width = max(len(bits), produced.bit_length(), limit.bit_length()) + 1
+            exceeds |= _geq_const(_add_const(bits, produced, width), limit)
 
-            # Constrain X' to match computed next value
-            relation &= ~(next_place_vars[p_idx] ^ next_val)
+    return enabled & exceeds
 
-        transitions.append(relation)
+
+def check_bounds(
+    pn: PetriNet, states: BinaryDecisionDiagram, overflow: BinaryDecisionDiagram, place_bits
+) -> None:
+    """Raise BoundExceededError if some marking in `states` lies in `overflow`."""
+    bad = states & overflow
+    if bad.is_zero():
+        return
+    cube = bad.satisfy_one()
+    marking = [
+        sum(int(cube.get(var, 0)) << j for j, var in enumerate(bits))
+        for bits in place_bits
+    ]
+    # The explicit firing rule builds the detailed message
+    for _ in pn.successors(marking):
+        pass
+    raise BoundExceededError(f"Marking {marking} exceeds a place bound")
+
+
+def build_transition_relation(
+    pn: PetriNet, place_bits, next_place_bits
+) -> BinaryDecisionDiagram:
+    """Build the global transition relation R(X, X') = OR_t R_t(X, X')."""
+    transitions = build_transition_relations(pn, place_bits, next_place_bits)
 
     # Global relation is the disjunction of every transition firing
     relation_all = BDDZERO
@@ -58,34 +145,203 @@ def _build_transition_relation(
     return relation_all
 
 
-def bdd_reachable(pn: PetriNet) -> Tuple[BinaryDecisionDiagram, int]:
-    """
-    Symbolic reachability analysis using the Pastor-Cortadella BDD algorithm
-    (Symbolic Analysis of Bounded Petri Nets). Assumes 1-safe nets so each
-    place maps to a boolean variable.
-    """
-    place_vars = [bddvar(pid) for pid in pn.place_ids]
-    next_place_vars = [bddvar(f"{pid}_next") for pid in pn.place_ids]
-
-    # R collects visited markings, F is the current frontier (both over X variables)
-    reachable = _initial_state_bdd(place_vars, pn.M0)
-    frontier = reachable
-
-    # Transition relation R(X, X')
-    relation = _build_transition_relation(pn, place_vars, next_place_vars)
+def post_image(
+    states: BinaryDecisionDiagram, relation: BinaryDecisionDiagram, place_bits, next_place_bits
+) -> BinaryDecisionDiagram:
+    """Successors of `states`: ∃X (S(X) ∧ R(X, X')), renamed back to X."""
+    place_vars = flatten_bits(place_bits)
+    next_place_vars = flatten_bits(next_place_bits)
     rename_next_to_curr = {nvar: var for var, nvar in zip(place_vars, next_place_vars)}
+    return (states & relation).smoothing(place_vars).compose(rename_next_to_curr)
+
 
+def iter_frontiers(
+    pn: PetriNet,
+    frontier: BinaryDecisionDiagram,
+    reachable: BinaryDecisionDiagram,
+    relation: BinaryDecisionDiagram,
+    overflow: BinaryDecisionDiagram,
+    place_bits,
+    next_place_bits,
+) -> Iterator[BinaryDecisionDiagram]:
+    """
+    Breadth-first symbolic exploration from `frontier` (already contained in
+    `reachable`): yield each onion ring of new markings until the fixpoint.
+    Every ring, the starting one included, is checked against `overflow`.
+    """
+    check_bounds(pn, frontier, overflow, place_bits)
     while not frontier.is_zero():
-        # Post-image: ∃X (F(X) ∧ R(X, X'))
-        successors_prime = (frontier & relation).smoothing(place_vars)
-        successors = successors_prime.compose(rename_next_to_curr)
+        successors = post_image(frontier, relation, place_bits, next_place_bits)
 
         new_states = successors & ~reachable
         if new_states.is_zero():
-            break
+            return
 
+        check_bounds(pn, new_states, overflow, place_bits)
         reachable |= new_states
         frontier = new_states
+        yield new_states
+
+
+class ReachabilityCache:
+    """
+    State kept between bdd_reachable calls in incremental mode: a snapshot
+    of the last net, its per-transition relations (by transition id), the
+    reachable set and the NetDiff of the last update.
+    """
+
+    def __init__(self):
+        self.pn: Optional[PetriNet] = None
+        self.relations: Dict[str, BinaryDecisionDiagram] = {}
+        self.overflows: Dict[str, BinaryDecisionDiagram] = {}
+        self.reachable: Optional[BinaryDecisionDiagram] = None
+        self.count: Optional[int] = None
+        self.last_diff: Optional[NetDiff] = None
+        # Relations rebuilt / fixpoint resumed in the last call (for reporting)
+        self.rebuilt: List[str] = []
+        self.resumed = False
+
+
+def bdd_reachable(
+    pn: PetriNet, cache: Optional[ReachabilityCache] = None
+) -> Tuple[BinaryDecisionDiagram, int]:
+    """
+    Symbolic reachability analysis using the Pastor-Cortadella BDD algorithm
+    (Symbolic Analysis of Bounded Petri Nets). Places are log-encoded on
+    ceil(log2(bounds[p] + 1)) variables, so a 1-safe net keeps one boolean
+    variable per place.
+
+    Incremental mode: pass the same ReachabilityCache across edits of a net.
+    Relations of unchanged transitions are reused, and if the edit only adds
+    transitions the fixpoint resumes from the cached reachable set.
+    """
+    place_bits = place_bdd_vars(pn)
+    next_place_bits = place_bdd_vars(pn, next_state=True)
+
+    diff = cache.pn.diff(pn) if cache is not None and cache.pn is not None else None
+    # Cached relations are only valid over the same variable encoding
+    reusable = diff is not None and not diff.places_changed and not diff.bounds_changed
+
+    # Transition relation R(X, X'), one partition per transition,
+    # and the markings from which each transition would exceed a bound
+    relations = {}
+    overflows = {}
+    rebuilt = []
+    for t_idx, tid in enumerate(pn.trans_ids):
+        if reusable and tid in cache.relations and tid not in diff.changed_transitions:
+            relations[tid] = cache.relations[tid]
+            overflows[tid] = cache.overflows[tid]
+        else:
+            relations[tid] = build_single_relation(
+                pn, t_idx, place_bits, next_place_bits
+            )
+            overflows[tid] = build_overflow_condition(pn, t_idx, place_bits)
+            rebuilt.append(tid)
+
+    relation = BDDZERO
+    for rel in relations.values():
+        relation |= rel
+    overflow = BDDZERO
+    for cond in overflows.values():
+        overflow |= cond
+
+    # R collects visited markings, F is the current frontier (both over X variables)
+    resumed = reusable and diff.only_adds_behavior
+    if resumed:
+        # Old markings stay reachable; only the new transitions can leave them
+        reachable = cache.reachable
+        # New transitions may overflow from markings checked before
+        check_bounds(pn, reachable, overflow, place_bits)
+        added = BDDZERO
+        for tid in diff.added_transitions:
+            added |= relations[tid]
+        successors = post_image(reachable, added, place_bits, next_place_bits)
+        frontier = successors & ~reachable
+        reachable |= frontier
+    else:
+        reachable = marking_bdd(place_bits, pn.M0)
+        frontier = reachable
+
+    for new_states in iter_frontiers(
+        pn, frontier, reachable, relation, overflow, place_bits, next_place_bits
+    ):
+        reachable |= new_states
+
+    # Exact count: satisfy_count() counts satisfy_all() cubes, not markings
+    count = count_markings(pn, reachable)
+
+    if cache is not None:
+        cache.pn = pn.copy()
+        cache.relations = relations
+        cache.overflows = overflows
+        cache.reachable = reachable
+        cache.count = count
+        cache.last_diff = diff
+        cache.rebuilt = rebuilt
+        cache.resumed = resumed
 
-    count = reachable.satisfy_count()
     return reachable, count
+
+
+def bdd_iter_markings(
+    pn: PetriNet, bdd: BinaryDecisionDiagram, block_size: int = 4096
+) -> Iterator[np.ndarray]:
+    """
+    Enumerate the markings encoded by a reachable-set BDD as fully expanded
+    token vectors, yielded in NumPy blocks of shape (<= block_size, num_places).
+
+    satisfy_all() returns partial cubes where variables outside the cube are
+    don't-cares; each cube is expanded here one block at a time, so memory
+    stays bounded by block_size even when a cube covers 2^k markings.
+    """
+    if block_size <= 0:
+        raise ValueError("block_size must be positive")
+
+    place_bits = place_bdd_vars(pn)
+    bit_vars = flatten_bits(place_bits)
+    var_to_index = {var: i for i, var in enumerate(bit_vars)}
+    num_bits = len(bit_vars)
+
+    # Bit column -> place column, weighted by 2^j (log encoding)
+    weights = np.zeros((num_bits, len(place_bits)), dtype=np.int64)
+    col = 0
+    for p_idx, bits in enumerate(place_bits):
+        for j in range(len(bits)):
+            weights[col, p_idx] = 1 << j
+            col += 1
+
+    dtype = pn.marking_dtype()
+    buffer = np.empty((block_size, num_bits), dtype=np.int64)
+    filled = 0
+
+    for cube in bdd.satisfy_all():
+        base = np.zeros(num_bits, dtype=np.int64)
+        fixed = np.zeros(num_bits, dtype=bool)
+        for var, value in cube.items():
+            idx = var_to_index.get(var)
+            if idx is not None:
+                base[idx] = value
+                fixed[idx] = True
+        free = np.flatnonzero(~fixed)
+
+        # Walk the 2^|free| completions of this cube by their binary index
+        total = 1 << len(free)
+        start = 0
+        while start < total:
+            take = min(block_size - filled, total - start)
+            rows = buffer[filled : filled + take]
+            rows[:] = base
+            if len(free):
+                # Bits above 63 stay 0: no consumer drains 2^64 rows of a cube
+                codes = np.arange(start, start + take, dtype=np.uint64)
+                for bit, b_idx in enumerate(free[:64]):
+                    rows[:, b_idx] = (codes >> np.uint64(bit)) & np.uint64(1)
+            filled += take
+            start += take
+
+            if filled == block_size:
+                yield (buffer @ weights).astype(dtype)
+                filled = 0
+
+    if filled:
+        yield (buffer[:filled] @ weights).astype(dtype)
@@ -1,38 +1,36 @@
 from collections import deque
-import numpy as np
 from src.PetriNet import PetriNet
-from typing import Set, Tuple
+from typing import Iterator, Set, Tuple
 
 
-def dfs_reachable(pn: PetriNet) -> Set[Tuple[int, ...]]:
+def dfs_iter_reachable(pn: PetriNet) -> Iterator[Tuple[int, ...]]:
+    """
+    Lazily yield reachable markings in DFS order, each one as soon as it is
+    discovered. Consumers can stop early (e.g. itertools.islice) or stream
+    the markings to disk without materializing the whole set.
+    """
     # Initialize the stack with the initial marking
     stack = [pn.M0]
 
-    # Set to store visited markings (as tuples for hashability)
+    # Set to store visited markings, packed into ints (per-place bit widths)
     visited = set()
-    visited.add(tuple(int(x) for x in pn.M0))
+    visited.add(pn.pack_marking(pn.M0))
+    yield tuple(int(x) for x in pn.M0)
 
     # DFS loop
     while stack:
         current_marking = stack.pop()
 
-        # Try to fire each transition (use I.shape[0] to get number of transitions)
-        for t_idx in range(pn.I.shape[0]):
-            # Check if transition t_idx is enabled
-            # A transition is enabled if current_marking >= I[t_idx, :]
-            # I is a matrix where rows are transitions and columns are places
-            if np.all(current_marking >= pn.I[t_idx, :]):
-                # Fire the transition: new_marking = current_marking - I[t_idx, :] + O[t_idx, :]
-                new_marking = current_marking - pn.I[t_idx, :] + pn.O[t_idx, :]
-
-                # Check 1-safe constraint: each place can have at most 1 token
-                if np.all(new_marking <= 1):
-                    # Convert to tuple for hashing (convert np.int64 to int)
-                    new_marking_tuple = tuple(int(x) for x in new_marking)
-
-                    # If not visited, add to stack and visited set
-                    if new_marking_tuple not in visited:
-                        visited.add(new_marking_tuple)
-                        stack.append(new_marking)
-
-    return visited
+        # Fire each enabled transition (firing rule: PetriNet.successors)
+        for _, new_marking in pn.successors(current_marking):
+            new_marking_code = pn.pack_marking(new_marking)
+
+            # If not visited, add to stack and visited set
+            if new_marking_code not in visited:
+                visited.add(new_marking_code)
+                stack.append(new_marking)
+                yield tuple(int(x) for x in new_marking)
+
+
+def dfs_reachable(pn: PetriNet) -> Set[Tuple[int, ...]]:
+    return set(dfs_iter_reachable(pn))
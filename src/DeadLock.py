@@ -1,23 +1,28 @@
+import contextlib
 import time
 from typing import List, Optional
 import pulp
-from pyeda.inter import bddvar
+from src.Encoding import marking_assignment, place_bdd_vars
 from src.PetriNet import PetriNet
 
 
-def check_deadlock(pn: PetriNet, reachable_bdd) -> Optional[List[int]]:
+def check_deadlock(pn: PetriNet, reachable_bdd, bdd_lock=None) -> Optional[List[int]]:
     """
     Task 4: Deadlock detection using ILP (PuLP) and BDD.
 
     Args:
         pn: PetriNet object (from Task 1)
         reachable_bdd: The BDD object representing reachable markings (from Task 3)
+        bdd_lock: Optional lock held around every pyeda call (pyeda is not
+            thread-safe); the ILP solves run outside it
 
     Returns:
-        List[int]: A deadlock marking (list of 0/1 for each place) if found.
+        List[int]: A deadlock marking (token count for each place) if found.
         None: If no deadlock exists.
     """
     start_time = time.time()
+    if bdd_lock is None:
+        bdd_lock = contextlib.nullcontext()
     num_places = len(pn.place_ids)
     num_trans = len(pn.trans_ids)
 
@@ -26,9 +31,30 @@ def check_deadlock(pn: PetriNet, reachable_bdd) -> Optional[List[int]]:
     prob = pulp.LpProblem("Deadlock_Detection", pulp.LpMaximize)
 
     # 2. Define Variables
-    # M[p]: Token count at place p (Binary because 1-safe)
-    # cat='Binary' ensures values are 0 or 1
-    M = [pulp.LpVariable(f"M_{i}", cat="Binary") for i in range(num_places)]
+    # M[p]: Token count at place p, Integer in [0, bounds[p]]
+    # (bounds[p] == 1 makes it the usual 0/1 variable of a 1-safe net)
+    M = [
+        pulp.LpVariable(
+            f"M_{i}", lowBound=0, upBound=int(pn.bounds[i]), cat="Integer"
+        )
+        for i in range(num_places)
+    ]
+
+    # Bits[p]: binary expansion of M[p] matching the BDD log encoding,
+    # used by the integer cuts below. A 1-bounded place is its own bit.
+    Bits = []
+    for p_idx in range(num_places):
+        width = int(pn.bit_widths[p_idx])
+        if width == 1:
+            Bits.append([M[p_idx]])
+            continue
+        bits = [
+            pulp.LpVariable(f"B_{p_idx}_{j}", cat="Binary") for j in range(width)
+        ]
+        prob += (
+            M[p_idx] == pulp.lpSum([(1 << j) * b for j, b in enumerate(bits)])
+        ), f"Bits_Place_{p_idx}"
+        Bits.append(bits)
 
     # Sigma[t]: Parikh vector (firing count). Integer, min=0
     Sigma = [
@@ -49,7 +75,10 @@ def check_deadlock(pn: PetriNet, reachable_bdd) -> Optional[List[int]]:
 
     # 4. Add Constraint: Dead Marking (Disable Condition)
     # A marking is dead if NO transition is enabled.
-    # Transition t is disabled if Sum(tokens in inputs) <= |inputs| - 1
+    # Transition t is disabled if some input place p has M[p] < I[t, p]
+    # (bounds are asserted, not capacities: reachability raises
+    # BoundExceededError on overflow, so token shortage is the only way
+    # a transition can be disabled)
     for t_idx in range(num_trans):
         # Get indices of input places for transition t
         input_places = [p_idx for p_idx, val in enumerate(pn.I[t_idx]) if val > 0]
@@ -61,17 +90,37 @@ def check_deadlock(pn: PetriNet, reachable_bdd) -> Optional[List[int]]:
             )
             return None
 
-        # Constraint: Sum(M[p] for p in inputs) <= len(inputs) - 1
-        prob += (
-            pulp.lpSum([M[p_idx] for p_idx in input_places]) <= len(input_places) - 1
-        ), f"Disable_Trans_{t_idx}"
+        if any(pn.I[t_idx, p_idx] > pn.bounds[p_idx] for p_idx in input_places):
+            # Needs more tokens than the place can hold => never enabled
+            continue
+
+        if all(pn.bounds[p_idx] == 1 for p_idx in input_places):
+            # 1-safe inputs: Sum(M[p] for p in inputs) <= len(inputs) - 1
+            prob += (
+                pulp.lpSum([M[p_idx] for p_idx in input_places])
+                <= len(input_places) - 1
+            ), f"Disable_Trans_{t_idx}"
+            continue
+
+        # General case: selector Y[p] = 1 picks an input place that is short,
+        # M[p] <= I[t, p] - 1 + bounds[p] * (1 - Y[p]), at least one Y[p] = 1
+        Y = {
+            p_idx: pulp.LpVariable(f"Y_{t_idx}_{p_idx}", cat="Binary")
+            for p_idx in input_places
+        }
+        prob += (pulp.lpSum(Y.values()) >= 1), f"Disable_Trans_{t_idx}"
+        for p_idx, y in Y.items():
+            prob += (
+                M[p_idx] <= int(pn.I[t_idx, p_idx]) - 1 + int(pn.bounds[p_idx]) * (1 - y)
+            ), f"Disable_Trans_{t_idx}_Place_{p_idx}"
 
     # 5. Iterative Solving (Hybrid Loop)
     iteration = 0
     print(f"  [Deadlock] Starting ILP(PuLP)+BDD search...")
 
     # Recreate BDD variables to match the mapping in Task 3
-    bdd_place_vars = [bddvar(pid) for pid in pn.place_ids]
+    with bdd_lock:
+        bdd_place_bits = place_bdd_vars(pn)
 
     while True:
         iteration += 1
@@ -90,13 +139,14 @@ def check_deadlock(pn: PetriNet, reachable_bdd) -> Optional[List[int]]:
 
         # Extract Candidate Marking M_cand
         # pulp.value(var) gets the value
-        m_cand = [int(pulp.value(var)) for var in M]
+        m_cand = [int(round(pulp.value(var))) for var in M]
 
         # 6. Check Reachability using BDD (Membership Check)
-        assignment = {var: val for var, val in zip(bdd_place_vars, m_cand)}
+        assignment = marking_assignment(bdd_place_bits, m_cand)
 
         # restrict returns 1 if path exists
-        is_reachable = reachable_bdd.restrict(assignment).is_one()
+        with bdd_lock:
+            is_reachable = reachable_bdd.restrict(assignment).is_one()
 
         if is_reachable:
             print(f"  [Deadlock] FOUND Deadlock at iteration {iteration}!")
@@ -105,14 +155,15 @@ def check_deadlock(pn: PetriNet, reachable_bdd) -> Optional[List[int]]:
             return m_cand
         else:
             # 7. Spurious Solution -> Add Integer Cut (Canonical Cut)
-            # Constraint: Sum(vars that are 1) - Sum(vars that are 0) <= (Num of 1s) - 1
+            # over the binary expansion of M (the bits of the BDD encoding)
+            # Constraint: Sum(bits that are 1) - Sum(bits that are 0) <= (Num of 1s) - 1
 
-            ones = [i for i, val in enumerate(m_cand) if val == 1]
-            zeros = [i for i, val in enumerate(m_cand) if val == 0]
+            ones, zeros = [], []
+            for bits, val in zip(Bits, m_cand):
+                for j, bit in enumerate(bits):
+                    (ones if (val >> j) & 1 else zeros).append(bit)
 
-            cut_lhs = pulp.lpSum([M[i] for i in ones]) - pulp.lpSum(
-                [M[i] for i in zeros]
-            )
+            cut_lhs = pulp.lpSum(ones) - pulp.lpSum(zeros)
             cut_rhs = len(ones) - 1
 
             prob += (cut_lhs <= cut_rhs), f"Cut_Iter_{iteration}"
@@ -0,0 +1,55 @@
+from typing import Dict, List
+from pyeda.boolalg.bdd import BDDONE
+from pyeda.inter import BinaryDecisionDiagram, bddvar
+from src.PetriNet import PetriNet
+
+
+def place_bdd_vars(pn: PetriNet, next_state: bool = False) -> List[List]:
+    """
+    Log encoding of the places: place p gets ceil(log2(bounds[p] + 1)) BDD
+    variables, least significant bit first. A 1-bounded place keeps the
+    single variable bddvar(pid); wider places use bddvar(pid, j).
+    Next-state variables carry the "_next" suffix.
+    """
+    place_bits = []
+    for pid, width in zip(pn.place_ids, pn.bit_widths):
+        name = f"{pid}_next" if next_state else pid
+        if width == 1:
+            place_bits.append([bddvar(name)])
+        else:
+            place_bits.append([bddvar(name, j) for j in range(int(width))])
+    return place_bits
+
+
+def marking_assignment(place_bits, marking) -> Dict:
+    """
+    Point assignment {bit variable: 0/1} encoding a marking.
+    Raises ValueError if a token count does not fit its place's bits.
+    """
+    if len(marking) != len(place_bits):
+        raise ValueError(
+            f"marking has {len(marking)} places, encoding has {len(place_bits)}"
+        )
+    assignment = {}
+    for p_idx, (bits, value) in enumerate(zip(place_bits, marking)):
+        if not 0 <= int(value) < (1 << len(bits)):
+            raise ValueError(
+                f"token count {int(value)} of place {p_idx} does not fit "
+                f"in {len(bits)} bit(s)"
+            )
+        for j, var in enumerate(bits):
+            assignment[var] = (int(value) >> j) & 1
+    return assignment
+
+
+def flatten_bits(place_bits) -> List:
+    """All bit variables of place_bdd_vars() in one flat list."""
+    return [var for bits in place_bits for var in bits]
+
+
+def marking_bdd(place_bits, marking) -> BinaryDecisionDiagram:
+    """Characteristic function of a single marking."""
+    state = BDDONE
+    for var, value in marking_assignment(place_bits, marking).items():
+        state &= var if value else ~var
+    return state
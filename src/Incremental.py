@@ -0,0 +1,76 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from pyeda.inter import BinaryDecisionDiagram
+from src.BDD import ReachabilityCache, bdd_reachable
+from src.DeadLock import check_deadlock
+from src.Optimization import max_reachable_marking
+from src.PetriNet import NetDiff, PetriNet
+
+_UNSET = object()
+
+
+class IncrementalAnalyzer:
+    """
+    Edit-and-recheck loop over one evolving net:
+
+        analyzer = IncrementalAnalyzer(pn)
+        analyzer.deadlock()
+        analyzer.update(edited_pn)   # reuses relations / resumes fixpoint
+        analyzer.deadlock()          # recomputed only if affected
+
+    Cached results are dropped only when the edit can change them:
+      - optimization results depend only on the reachable set;
+      - the deadlock result depends on the reachable set and on the
+        enabling conditions (transitions added/removed, input arcs changed);
+      - both are markings (and coefficient vectors) in place order, so
+        reordering the places drops them too.
+    """
+
+    def __init__(self, pn: PetriNet):
+        self.cache = ReachabilityCache()
+        self.pn = pn
+        self.reachable, self.count = bdd_reachable(pn, self.cache)
+        self._deadlock = _UNSET
+        self._optimize: Dict[tuple, Tuple[Optional[List[int]], Optional[float]]] = {}
+
+    def update(self, pn: PetriNet) -> NetDiff:
+        """Re-analyze after an edit; returns what changed w.r.t. the last net."""
+        old_reachable = self.reachable
+        old_place_ids = self.pn.place_ids
+        # May raise BoundExceededError; the analyzer is then left unchanged
+        self.reachable, self.count = bdd_reachable(pn, self.cache)
+        self.pn = pn
+        diff = self.cache.last_diff
+
+        # BDDs are canonical: same function <=> same node
+        same_reachable = not diff.places_changed and self.reachable.equivalent(
+            old_reachable
+        )
+        # NetDiff matches places by id, but cached answers are positional
+        reordered = list(old_place_ids) != list(pn.place_ids)
+        if not same_reachable or reordered:
+            self._optimize.clear()
+
+        guards_changed = (
+            diff.added_transitions or diff.removed_transitions or diff.changed_guards
+        )
+        if not same_reachable or reordered or guards_changed:
+            self._deadlock = _UNSET
+
+        return diff
+
+    def reachable_bdd(self) -> Tuple[BinaryDecisionDiagram, int]:
+        return self.reachable, self.count
+
+    def deadlock(self) -> Optional[List[int]]:
+        if self._deadlock is _UNSET:
+            self._deadlock = check_deadlock(self.pn, self.reachable)
+        return self._deadlock
+
+    def optimize(self, c: np.ndarray) -> Tuple[Optional[List[int]], Optional[float]]:
+        key = tuple(float(x) for x in c)
+        if key not in self._optimize:
+            self._optimize[key] = max_reachable_marking(
+                self.pn.place_ids, self.reachable, np.asarray(c), self.pn.bounds
+            )
+        return self._optimize[key]
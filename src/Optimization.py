@@ -6,8 +6,14 @@ from itertools import product
 def max_reachable_marking(
     place_ids: List[str], 
     bdd: BinaryDecisionDiagram, 
-    c: np.ndarray
+    c: np.ndarray,
+    bounds: Optional[np.ndarray] = None
 ) -> Tuple[Optional[List[int]], Optional[float]]:
+    """
+    bounds[p] gives the token capacity of each place (default: 1-safe).
+    A place with bound k is log-encoded on ceil(log2(k + 1)) BDD variables
+    named after the place id, bit j carrying the index j.
+    """
     
     max_value = -float('inf') 
     best_marking = None
@@ -20,14 +26,20 @@ def max_reachable_marking(
     
     # Ánh xạ tên biến sang index trong vector c (và marking)
     name_to_index = {name: i for i, name in enumerate(place_ids)}
+
+    # Số bit của mỗi place theo log encoding (1 bit nếu 1-safe)
+    if bounds is None:
+        widths = [1] * len(place_ids)
+    else:
+        widths = [max(int(k).bit_length(), 1) for k in bounds]
     
     for assignment in satisfying_assignments:
         
         current_marking = [0] * len(place_ids)
         current_value = 0.0
 
-        # Lưu lại các biến đã được gán giá trị trong assignment
-        assigned_indices = set()
+        # Lưu lại các bit (place, bit) đã được gán giá trị trong assignment
+        assigned_bits = set()
 
         # 1. Gán giá trị cho các biến CÓ trong assignment (Ràng buộc BDD)
         for bdd_var, value in assignment.items():
@@ -35,10 +47,11 @@ def max_reachable_marking(
             
             try:
                 idx = name_to_index[var_name]
-                p_i = int(value)
-                current_marking[idx] = p_i
+                bit = bdd_var.indices[0] if bdd_var.indices else 0
+                p_i = int(value) << bit
+                current_marking[idx] += p_i
                 current_value += c[idx] * p_i
-                assigned_indices.add(idx)
+                assigned_bits.add((idx, bit))
             except KeyError:
                 continue
 
@@ -47,14 +60,16 @@ def max_reachable_marking(
         # PyEDA đôi khi tối ưu hóa assignment, nên ta cần quét lại tất cả indices.
         
         for idx in range(len(place_ids)):
-            if idx not in assigned_indices:
-                # Đây là biến don't care. Áp dụng quy tắc tối ưu:
-                # Nếu c[idx] > 0, chọn p_i = 1 để tối đa hóa
-                # Nếu c[idx] <= 0, chọn p_i = 0 để loại bỏ giá trị âm/không thêm 0
+            for bit in range(widths[idx]):
+                if (idx, bit) in assigned_bits:
+                    continue
+                # Đây là bit don't care. Áp dụng quy tắc tối ưu:
+                # Nếu c[idx] > 0, chọn bit = 1 để tối đa hóa
+                # Nếu c[idx] <= 0, chọn bit = 0 để loại bỏ giá trị âm/không thêm 0
                 
-                p_i_opt = 1 if c[idx] > 0 else 0
+                p_i_opt = (1 << bit) if c[idx] > 0 else 0
                 
-                current_marking[idx] = p_i_opt
+                current_marking[idx] += p_i_opt
                 current_value += c[idx] * p_i_opt
         
         # 3. Cập nhật giá trị tối đa
@@ -1,6 +1,87 @@
 import numpy as np
 import xml.etree.ElementTree as ET
-from typing import List, Optional
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+
+class BoundExceededError(ValueError):
+    """
+    A reachable firing puts more tokens in a place than its bound allows:
+    the net is not k-bounded for the given bounds, so any state space
+    computed with them would be incomplete.
+    """
+
+
+class NetDiff:
+    """
+    Structural difference between two nets, by place and transition id.
+    Built by PetriNet.diff(); `old` is the receiver, `new` the argument.
+    """
+
+    def __init__(
+        self,
+        added_places: List[str],
+        removed_places: List[str],
+        added_transitions: List[str],
+        removed_transitions: List[str],
+        changed_transitions: List[str],
+        changed_guards: List[str],
+        m0_changed: bool,
+        bounds_changed: bool,
+    ):
+        self.added_places = added_places
+        self.removed_places = removed_places
+        self.added_transitions = added_transitions
+        self.removed_transitions = removed_transitions
+        # Transitions in both nets whose arcs differ (input or output)
+        self.changed_transitions = changed_transitions
+        # Subset of changed_transitions whose input arcs (enabling) differ
+        self.changed_guards = changed_guards
+        self.m0_changed = m0_changed
+        self.bounds_changed = bounds_changed
+
+    @property
+    def places_changed(self) -> bool:
+        return bool(self.added_places or self.removed_places)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.places_changed
+            or self.added_transitions
+            or self.removed_transitions
+            or self.changed_transitions
+            or self.m0_changed
+            or self.bounds_changed
+        )
+
+    @property
+    def only_adds_behavior(self) -> bool:
+        """
+        True when the new net can only reach more markings: same places,
+        bounds and M0, and the only edit is new transitions.
+        """
+        return (
+            not self.places_changed
+            and not self.bounds_changed
+            and not self.m0_changed
+            and not self.removed_transitions
+            and not self.changed_transitions
+        )
+
+    def __str__(self) -> str:
+        fields = [
+            ("added places", self.added_places),
+            ("removed places", self.removed_places),
+            ("added transitions", self.added_transitions),
+            ("removed transitions", self.removed_transitions),
+            ("changed transitions", self.changed_transitions),
+        ]
+        s = [f"{label}: {ids}" for label, ids in fields if ids]
+        if self.m0_changed:
+            s.append("initial marking changed")
+        if self.bounds_changed:
+            s.append("place bounds changed")
+        return "\n".join(s) if s else "no changes"
 
 
 class PetriNet:
@@ -13,6 +94,7 @@ class PetriNet:
         I: np.ndarray,
         O: np.ndarray,
         M0: np.ndarray,
+        bounds: Optional[np.ndarray] = None,
     ):
         self.place_ids = place_ids
         self.trans_ids = trans_ids
@@ -21,9 +103,158 @@ class PetriNet:
         self.I = I
         self.O = O
         self.M0 = M0
+        # bounds[p]: max tokens place p may hold (1 everywhere = 1-safe net)
+        if bounds is None:
+            bounds = np.maximum(M0, 1)
+        self.bounds = bounds
+
+    @property
+    def bounds(self) -> np.ndarray:
+        return self._bounds
+
+    @bounds.setter
+    def bounds(self, bounds) -> None:
+        """
+        Replace the place bounds and recompute the encoding derived from them.
+        The stored array is read-only: assign a new array to change a bound.
+        """
+        bounds = np.array(bounds, dtype=int)
+        if bounds.shape != (len(self.place_ids),):
+            raise ValueError(
+                f"bounds has shape {bounds.shape}, net has {len(self.place_ids)} places"
+            )
+        below = np.flatnonzero(bounds < np.asarray(self.M0))
+        if len(below):
+            p_idx = int(below[0])
+            raise ValueError(
+                f"bound {int(bounds[p_idx])} of place {self.place_ids[p_idx]} is "
+                f"below its initial marking {int(self.M0[p_idx])}"
+            )
+        bounds.setflags(write=False)
+        self._bounds = bounds
+
+        # Packed explicit states: place p occupies bit_widths[p] bits at _offsets[p]
+        self.bit_widths = np.array([max(int(k).bit_length(), 1) for k in bounds])
+        self._offsets = [0] + [int(x) for x in np.cumsum(self.bit_widths)[:-1]]
+
+    def successors(self, marking: Sequence[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield (t_idx, new_marking) for every transition enabled in `marking`.
+        This is the firing rule shared by all explicit explorers.
+
+        Bounds are asserted, not capacities: a firing that exceeds
+        bounds[p] raises BoundExceededError instead of being skipped.
+        """
+        current_marking = np.asarray(marking)
+        for t_idx in range(self.I.shape[0]):
+            # A transition is enabled if current_marking >= I[t_idx, :]
+            if np.all(current_marking >= self.I[t_idx, :]):
+                # Fire the transition: new_marking = current_marking - I[t_idx, :] + O[t_idx, :]
+                new_marking = current_marking - self.I[t_idx, :] + self.O[t_idx, :]
+
+                # Check bound: place p can hold at most bounds[p] tokens
+                over = np.flatnonzero(new_marking > self.bounds)
+                if len(over):
+                    p_idx = int(over[0])
+                    raise BoundExceededError(
+                        f"Firing {self.trans_ids[t_idx]} from "
+                        f"{[int(x) for x in current_marking]} puts "
+                        f"{int(new_marking[p_idx])} tokens in place "
+                        f"{self.place_ids[p_idx]} (bound {int(self.bounds[p_idx])}); "
+                        f"the net is not bounded by these bounds, raise them"
+                    )
+                yield t_idx, new_marking
+
+    def pack_marking(self, marking: Sequence[int]) -> int:
+        """Pack a marking into one int using the per-place bit widths."""
+        code = 0
+        for value, offset in zip(marking, self._offsets):
+            code |= int(value) << offset
+        return code
+
+    def unpack_marking(self, code: int) -> Tuple[int, ...]:
+        """Inverse of pack_marking."""
+        return tuple(
+            (code >> offset) & ((1 << int(width)) - 1)
+            for offset, width in zip(self._offsets, self.bit_widths)
+        )
+
+    def marking_dtype(self):
+        """Smallest NumPy integer dtype that holds every bounded marking."""
+        return np.int8 if self.bounds.max(initial=0) <= np.iinfo(np.int8).max else np.int64
+
+    def copy(self) -> "PetriNet":
+        return PetriNet(
+            list(self.place_ids),
+            list(self.trans_ids),
+            list(self.place_names),
+            list(self.trans_names),
+            self.I.copy(),
+            self.O.copy(),
+            self.M0.copy(),
+            self.bounds.copy(),
+        )
+
+    def diff(self, other: "PetriNet") -> NetDiff:
+        """
+        Compare this net (old) with `other` (new). Places and transitions are
+        matched by id, so reordering them is not reported as a change.
+        """
+        old_places = {pid: i for i, pid in enumerate(self.place_ids)}
+        new_places = {pid: i for i, pid in enumerate(other.place_ids)}
+        old_trans = {tid: i for i, tid in enumerate(self.trans_ids)}
+        new_trans = {tid: i for i, tid in enumerate(other.trans_ids)}
+
+        common_places = [pid for pid in self.place_ids if pid in new_places]
+        old_cols = [old_places[pid] for pid in common_places]
+        new_cols = [new_places[pid] for pid in common_places]
+        places_changed = len(common_places) != len(self.place_ids) or len(
+            common_places
+        ) != len(other.place_ids)
+
+        changed_transitions = []
+        changed_guards = []
+        for tid in self.trans_ids:
+            if tid not in new_trans:
+                continue
+            t_old, t_new = old_trans[tid], new_trans[tid]
+            guard_differs = not np.array_equal(
+                self.I[t_old, old_cols], other.I[t_new, new_cols]
+            )
+            output_differs = not np.array_equal(
+                self.O[t_old, old_cols], other.O[t_new, new_cols]
+            )
+            if places_changed:
+                # Arcs to places that exist in only one of the nets
+                guard_differs |= self.I[t_old].sum() != self.I[t_old, old_cols].sum()
+                guard_differs |= other.I[t_new].sum() != other.I[t_new, new_cols].sum()
+                output_differs |= self.O[t_old].sum() != self.O[t_old, old_cols].sum()
+                output_differs |= other.O[t_new].sum() != other.O[t_new, new_cols].sum()
+            if guard_differs or output_differs:
+                changed_transitions.append(tid)
+            if guard_differs:
+                changed_guards.append(tid)
+
+        return NetDiff(
+            added_places=[pid for pid in other.place_ids if pid not in old_places],
+            removed_places=[pid for pid in self.place_ids if pid not in new_places],
+            added_transitions=[tid for tid in other.trans_ids if tid not in old_trans],
+            removed_transitions=[tid for tid in self.trans_ids if tid not in new_trans],
+            changed_transitions=changed_transitions,
+            changed_guards=changed_guards,
+            # M0 and bounds are compared on the places both nets share
+            m0_changed=not np.array_equal(self.M0[old_cols], other.M0[new_cols]),
+            bounds_changed=not np.array_equal(
+                self.bounds[old_cols], other.bounds[new_cols]
+            ),
+        )
 
     @classmethod
-    def from_pnml(cls, filename: str) -> "PetriNet":
+    def from_pnml(cls, filename: str, bound: int = 1) -> "PetriNet":
+        """
+        Parse a PNML file. `bound` is the token capacity assumed for every
+        place (raised per place to its initial marking if that is larger).
+        """
         ## TODO read file PNML
         # Parse the XML file
         tree = ET.parse(filename)
@@ -85,18 +316,22 @@ class PetriNet:
             source = arc.get("source")
             target = arc.get("target")
 
+            # Arc weight (PNML inscription), 1 if absent
+            weight_elem = arc.find(".//pnml:inscription/pnml:text", ns)
+            weight = int(weight_elem.text) if weight_elem is not None else 1
+
             # Check if arc is from place to transition (I matrix)
             if source in place_idx and target in trans_idx:
                 p_idx = place_idx[source]
                 t_idx = trans_idx[target]
-                I[t_idx, p_idx] = 1
+                I[t_idx, p_idx] = weight
                 valid_arcs.append((source, target))
 
             # Check if arc is from transition to place (O matrix)
             elif source in trans_idx and target in place_idx:
                 t_idx = trans_idx[source]
                 p_idx = place_idx[target]
-                O[t_idx, p_idx] = 1
+                O[t_idx, p_idx] = weight
                 valid_arcs.append((source, target))
             else:
                 # Arc references missing node
@@ -154,7 +389,9 @@ class PetriNet:
             [place_initial_markings.get(pid, 0) for pid in place_ids], dtype=int
         )
 
-        return cls(place_ids, trans_ids, place_names, trans_names, I, O, M0)
+        bounds = np.maximum(M0, bound)
+
+        return cls(place_ids, trans_ids, place_names, trans_names, I, O, M0, bounds)
 
     def __str__(self) -> str:
         s = []
@@ -168,4 +405,6 @@ class PetriNet:
         s.append(str(self.O))
         s.append("\nInitial marking M0:")
         s.append(str(self.M0))
+        s.append("\nPlace bounds:")
+        s.append(str(self.bounds))
         return "\n".join(s)
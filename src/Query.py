@@ -0,0 +1,139 @@
+from array import array
+from typing import Callable, List, Optional, Tuple
+from pyeda.boolalg.bdd import BDDZERO
+from pyeda.inter import BinaryDecisionDiagram
+from src.BDD import (
+    build_overflow_condition,
+    build_transition_relations,
+    iter_frontiers,
+)
+from src.Encoding import flatten_bits, marking_bdd, place_bdd_vars
+from src.PetriNet import PetriNet
+
+Marking = Tuple[int, ...]
+Witness = Tuple[Marking, List[str]]
+
+
+def find_reachable(
+    pn: PetriNet, predicate: Callable[[Marking], bool]
+) -> Optional[Witness]:
+    """
+    On-the-fly BFS query: stop at the first reachable marking satisfying
+    `predicate` and return it together with a shortest firing sequence
+    (list of transition ids) from M0.
+
+    Predecessors are kept as two flat arrays indexed by state id
+    (parent state id, transition index) instead of per-state Python objects.
+
+    Examples:
+        find_reachable(pn, lambda m: m == target)         # is M reachable?
+        find_reachable(pn, lambda m: m[p_idx] > 0)        # can p be marked?
+
+    Returns:
+        (marking, firing sequence) if a hit is found, None otherwise.
+    """
+    initial = pn.pack_marking(pn.M0)
+
+    # State id -> packed marking; the list doubles as the BFS queue (head pointer)
+    states = [initial]
+    index = {initial: 0}
+    parent = array("l", [-1])
+    via = array("l", [-1])
+
+    head = 0
+    while head < len(states):
+        current = pn.unpack_marking(states[head])
+        if predicate(current):
+            return current, _trace(pn, parent, via, head)
+
+        for t_idx, new_marking in pn.successors(current):
+            new_marking_code = pn.pack_marking(new_marking)
+            if new_marking_code not in index:
+                index[new_marking_code] = len(states)
+                states.append(new_marking_code)
+                parent.append(head)
+                via.append(t_idx)
+        head += 1
+
+    return None
+
+
+def _trace(pn: PetriNet, parent: array, via: array, state: int) -> List[str]:
+    """Follow predecessor pointers back to M0 and return the firing sequence."""
+    sequence = []
+    while parent[state] >= 0:
+        sequence.append(pn.trans_ids[via[state]])
+        state = parent[state]
+    sequence.reverse()
+    return sequence
+
+
+def bdd_find_reachable(
+    pn: PetriNet, target: BinaryDecisionDiagram
+) -> Optional[Witness]:
+    """
+    Symbolic counterpart of find_reachable. `target` is a BDD over the place
+    variables of place_bdd_vars(pn) (e.g. bddvar("p1") & ~bddvar("p2") on a
+    1-safe net).
+
+    Runs the bdd_reachable fixpoint but keeps every onion ring (the frontier
+    at each BFS depth) and stops at the first ring that meets `target`. The
+    witness is rebuilt backwards through the rings with per-transition
+    pre-images, so the firing sequence is a shortest one.
+    """
+    place_bits = place_bdd_vars(pn)
+    next_place_bits = place_bdd_vars(pn, next_state=True)
+    place_vars = flatten_bits(place_bits)
+    next_place_vars = flatten_bits(next_place_bits)
+    relations = build_transition_relations(pn, place_bits, next_place_bits)
+
+    rename_curr_to_next = {var: nvar for var, nvar in zip(place_vars, next_place_vars)}
+
+    relation = BDDZERO
+    for rel in relations:
+        relation |= rel
+    overflow = BDDZERO
+    for t_idx in range(len(relations)):
+        overflow |= build_overflow_condition(pn, t_idx, place_bits)
+
+    initial = marking_bdd(place_bits, pn.M0)
+    rings = [initial]
+
+    hit = initial & target
+    if hit.is_zero():
+        for ring in iter_frontiers(
+            pn, initial, initial, relation, overflow, place_bits, next_place_bits
+        ):
+            rings.append(ring)
+            hit = ring & target
+            if not hit.is_zero():
+                break
+        else:
+            return None
+
+    # Walk back from the hit ring: find a predecessor in ring i for each step
+    marking = _pick_marking(hit, place_bits)
+    current = marking
+    sequence = []
+    for ring in reversed(rings[:-1]):
+        point_next = marking_bdd(place_bits, current).compose(
+            rename_curr_to_next
+        )
+        for t_idx, rel in enumerate(relations):
+            predecessors = (rel & point_next).smoothing(next_place_vars) & ring
+            if not predecessors.is_zero():
+                sequence.append(pn.trans_ids[t_idx])
+                current = _pick_marking(predecessors, place_bits)
+                break
+    sequence.reverse()
+
+    return tuple(marking), sequence
+
+
+def _pick_marking(states: BinaryDecisionDiagram, place_bits) -> List[int]:
+    """Pick one full marking from a non-empty BDD (don't-care bits set to 0)."""
+    cube = states.satisfy_one()
+    return [
+        sum(int(cube.get(var, 0)) << j for j, var in enumerate(bits))
+        for bits in place_bits
+    ]
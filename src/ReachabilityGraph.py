@@ -0,0 +1,234 @@
+import os
+from typing import List, Optional
+import numpy as np
+from src.PetriNet import PetriNet
+
+
+class _GrowableArray:
+    """Append-only NumPy buffer that doubles its capacity when full."""
+
+    def __init__(self, dtype, row_shape=(), capacity: int = 1024):
+        self._data = np.empty((capacity,) + tuple(row_shape), dtype=dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, value) -> None:
+        if self._size == len(self._data):
+            grown = np.empty((2 * len(self._data),) + self._data.shape[1:], self._data.dtype)
+            grown[: self._size] = self._data
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+
+    def view(self) -> np.ndarray:
+        return self._data[: self._size]
+
+
+class ReachabilityGraph:
+    """
+    Labelled transition system of a Petri net in CSR form.
+
+    State i is markings[i]; its outgoing arcs are dst[indptr[i]:indptr[i+1]]
+    with the fired transition indices in trans[indptr[i]:indptr[i+1]].
+    State 0 is the initial marking.
+    """
+
+    FILES = ("markings", "indptr", "dst", "trans")
+
+    def __init__(
+        self,
+        markings: np.ndarray,
+        indptr: np.ndarray,
+        dst: np.ndarray,
+        trans: np.ndarray,
+        trans_ids: Optional[List[str]] = None,
+    ):
+        self.markings = markings
+        self.indptr = indptr
+        self.dst = dst
+        self.trans = trans
+        self.trans_ids = trans_ids
+
+    @property
+    def num_states(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.dst)
+
+    def save(self, directory: str) -> None:
+        """Write each array to <directory>/<name>.npy."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        if self.trans_ids is not None:
+            np.save(os.path.join(directory, "trans_ids.npy"), np.array(self.trans_ids))
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "ReachabilityGraph":
+        """Load a saved graph; arrays are memory-mapped unless mmap_mode=None."""
+        arrays = [
+            np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in cls.FILES
+        ]
+        trans_ids_path = os.path.join(directory, "trans_ids.npy")
+        trans_ids = None
+        if os.path.exists(trans_ids_path):
+            trans_ids = [str(t) for t in np.load(trans_ids_path)]
+        return cls(*arrays, trans_ids=trans_ids)
+
+    def deadlocks(self) -> np.ndarray:
+        """State ids with no outgoing arc."""
+        return np.flatnonzero(np.diff(self.indptr) == 0)
+
+    def strongly_connected_components(self) -> np.ndarray:
+        """
+        Iterative Tarjan over the CSR arrays.
+        Returns the component id of every state.
+        """
+        n = self.num_states
+        indptr, dst = self.indptr, self.dst
+
+        index = np.full(n, -1, dtype=np.int64)
+        lowlink = np.zeros(n, dtype=np.int64)
+        on_stack = np.zeros(n, dtype=bool)
+        component = np.full(n, -1, dtype=np.int64)
+        next_edge = np.zeros(n, dtype=np.int64)
+
+        stack = []
+        counter = 0
+        num_components = 0
+
+        for root in range(n):
+            if index[root] >= 0:
+                continue
+
+            call_stack = [root]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            next_edge[root] = indptr[root]
+            stack.append(root)
+            on_stack[root] = True
+
+            while call_stack:
+                v = call_stack[-1]
+                if next_edge[v] < indptr[v + 1]:
+                    w = int(dst[next_edge[v]])
+                    next_edge[v] += 1
+                    if index[w] < 0:
+                        index[w] = lowlink[w] = counter
+                        counter += 1
+                        next_edge[w] = indptr[w]
+                        stack.append(w)
+                        on_stack[w] = True
+                        call_stack.append(w)
+                    elif on_stack[w]:
+                        lowlink[v] = min(lowlink[v], index[w])
+                    continue
+
+                # All successors of v done: close its component if v is a root
+                call_stack.pop()
+                if call_stack:
+                    parent = call_stack[-1]
+                    lowlink[parent] = min(lowlink[parent], lowlink[v])
+                if lowlink[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component[w] = num_components
+                        if w == v:
+                            break
+                    num_components += 1
+
+        return component
+
+    def bottom_components(self) -> List[np.ndarray]:
+        """Terminal SCCs (no arc leaves them), as arrays of state ids."""
+        component = self.strongly_connected_components()
+        num_components = int(component.max()) + 1 if len(component) else 0
+
+        src = np.repeat(np.arange(self.num_states), np.diff(self.indptr))
+        leaving = component[src] != component[self.dst]
+        is_bottom = np.ones(num_components, dtype=bool)
+        is_bottom[component[src[leaving]]] = False
+
+        return [np.flatnonzero(component == c) for c in np.flatnonzero(is_bottom)]
+
+    def home_markings(self) -> np.ndarray:
+        """
+        States reachable from every reachable state. These exist iff there is
+        exactly one bottom SCC, and are then exactly its states.
+        """
+        bottoms = self.bottom_components()
+        if len(bottoms) != 1:
+            return np.empty(0, dtype=np.int64)
+        return bottoms[0]
+
+    def live_transitions(self, num_trans: Optional[int] = None) -> np.ndarray:
+        """
+        L4-liveness per transition: t is live iff every bottom SCC contains
+        an arc labelled t (from any state t can then always fire again).
+        """
+        if num_trans is None:
+            if self.trans_ids is not None:
+                num_trans = len(self.trans_ids)
+            else:
+                num_trans = int(self.trans.max()) + 1 if len(self.trans) else 0
+
+        live = np.ones(num_trans, dtype=bool)
+        for states in self.bottom_components():
+            labels = np.zeros(num_trans, dtype=bool)
+            for s in states:
+                labels[self.trans[self.indptr[s] : self.indptr[s + 1]]] = True
+            live &= labels
+        return live
+
+
+def build_reachability_graph(pn: PetriNet) -> ReachabilityGraph:
+    """
+    BFS exploration that assigns dense state ids in discovery order and
+    records every firing as an arc (src, dst, transition index) in growable
+    array buffers, then packs the arcs into CSR form.
+    """
+    num_places = pn.I.shape[1]
+
+    # Packed marking -> state id
+    index = {pn.pack_marking(pn.M0): 0}
+    markings = _GrowableArray(pn.marking_dtype(), (num_places,))
+    markings.append(pn.M0)
+
+    src = _GrowableArray(np.int64)
+    dst = _GrowableArray(np.int64)
+    trans = _GrowableArray(np.int32)
+
+    # States are expanded in id order, so src comes out sorted
+    head = 0
+    while head < len(markings):
+        current_marking = markings.view()[head].astype(int)
+        for t_idx, new_marking in pn.successors(current_marking):
+            new_marking_code = pn.pack_marking(new_marking)
+            target = index.get(new_marking_code)
+            if target is None:
+                target = len(markings)
+                index[new_marking_code] = target
+                markings.append(new_marking)
+
+            src.append(head)
+            dst.append(target)
+            trans.append(t_idx)
+        head += 1
+
+    num_states = len(markings)
+    indptr = np.zeros(num_states + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src.view(), minlength=num_states), out=indptr[1:])
+
+    return ReachabilityGraph(
+        markings.view().copy(),
+        indptr,
+        dst.view().copy(),
+        trans.view().copy(),
+        trans_ids=list(pn.trans_ids),
+    )
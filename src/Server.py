@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Long-running analysis server. Loads each net once and keeps its PetriNet,
+reachable BDD and previous answers warm in an LRU keyed by the PNML hash.
+
+Protocol: one JSON object per line, one JSON reply per line (with the same
+"id"). Served on stdin/stdout by default, or on a Unix socket:
+
+    python -m src.Server
+    python -m src.Server --socket /tmp/petri.sock --cache-size 8
+
+Requests ("pnml" is a path; "net" is the hash returned by "load"):
+    {"id": 1, "op": "load", "pnml": "TestModel.pnml", "bound": 1}
+    {"id": 2, "op": "count", "net": "<hash>"}
+    {"id": 3, "op": "reachable", "net": "<hash>", "marking": [0, 1, ...]}
+    {"id": 4, "op": "deadlock", "pnml": "TestModel.pnml"}
+    {"id": 5, "op": "optimize", "net": "<hash>", "c": [10, 0, ...]}
+
+pyeda and pulp are only imported once a request needs them.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+import numpy as np
+from src.PetriNet import PetriNet
+
+# pyeda keeps a global node table that is not thread-safe:
+# every BDD operation across all nets goes through this lock,
+# held only for the pyeda calls themselves (never for an ILP solve).
+_BDD_LOCK = threading.Lock()
+
+
+class _NetEntry:
+    """Cached artifacts of one net; each is computed on first use."""
+
+    def __init__(self, net_hash: str, pn: PetriNet):
+        self.net_hash = net_hash
+        self.pn = pn
+        self.bdd = None
+        self.count: Optional[int] = None
+        # One future per question ("deadlock", ("optimize", c), ...)
+        self.answers: Dict[Hashable, Future] = {}
+        # lock guards the BDD; answers_lock only the answers dict, so
+        # independent questions on the same net never wait for each other
+        self.lock = threading.Lock()
+        self.answers_lock = threading.Lock()
+
+    def answer(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Cached answer to one question. The first caller computes it outside
+        any lock; concurrent callers asking the same question wait for that
+        result. A failed computation is not cached.
+        """
+        with self.answers_lock:
+            future = self.answers.get(key)
+            owner = future is None
+            if owner:
+                future = self.answers[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self.answers_lock:
+                del self.answers[key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    def reachable_bdd(self):
+        with self.lock:
+            if self.bdd is None:
+                from src.BDD import bdd_reachable
+
+                with _BDD_LOCK:
+                    self.bdd, self.count = bdd_reachable(self.pn)
+            return self.bdd
+
+
+class NetCache:
+    """
+    Thread-safe LRU of _NetEntry keyed by the SHA-256 of the PNML bytes
+    (and the place bound the net was loaded with).
+    """
+
+    def __init__(self, capacity: int = 8):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, _NetEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, pnml_file: str, bound: int = 1) -> _NetEntry:
+        with open(pnml_file, "rb") as f:
+            digest = hashlib.sha256(f.read())
+        if bound != 1:
+            digest.update(f"bound={bound}".encode())
+        net_hash = digest.hexdigest()
+
+        with self._lock:
+            entry = self._entries.get(net_hash)
+            if entry is not None:
+                self._entries.move_to_end(net_hash)
+                return entry
+
+        pn = PetriNet.from_pnml(pnml_file, bound)
+
+        with self._lock:
+            # Another thread may have loaded the same net meanwhile
+            entry = self._entries.setdefault(net_hash, _NetEntry(net_hash, pn))
+            self._entries.move_to_end(net_hash)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            return entry
+
+    def get(self, net_hash: str) -> _NetEntry:
+        with self._lock:
+            entry = self._entries.get(net_hash)
+            if entry is None:
+                raise KeyError(f"unknown or evicted net '{net_hash}', send 'load' again")
+            self._entries.move_to_end(net_hash)
+            return entry
+
+
+class AnalysisServer:
+    def __init__(self, cache_size: int = 8, workers: int = 4):
+        self.cache = NetCache(cache_size)
+        self.workers = workers
+        self.ops = {
+            "load": self._load,
+            "count": self._count,
+            "reachable": self._reachable,
+            "deadlock": self._deadlock,
+            "optimize": self._optimize,
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request; errors are reported in the reply, never raised."""
+        reply: Dict[str, Any] = {"id": request.get("id")}
+        try:
+            op = self.ops.get(request.get("op"))
+            if op is None:
+                raise ValueError(f"unknown op {request.get('op')!r}")
+            reply.update(op(request))
+        except Exception as e:
+            reply["error"] = f"{type(e).__name__}: {e}"
+        return reply
+
+    def _entry(self, request: Dict[str, Any]) -> _NetEntry:
+        if "net" in request:
+            return self.cache.get(request["net"])
+        if "pnml" in request:
+            return self.cache.load(request["pnml"], int(request.get("bound", 1)))
+        raise ValueError("request needs 'net' or 'pnml'")
+
+    def _load(self, request):
+        entry = self._entry(request)
+        pn = entry.pn
+        return {
+            "net": entry.net_hash,
+            "places": pn.place_ids,
+            "transitions": pn.trans_ids,
+        }
+
+    def _count(self, request):
+        entry = self._entry(request)
+        entry.reachable_bdd()
+        return {"count": entry.count}
+
+    def _reachable(self, request):
+        from src.Encoding import marking_assignment, place_bdd_vars
+
+        entry = self._entry(request)
+        marking = [int(x) for x in request["marking"]]
+        if len(marking) != len(entry.pn.place_ids):
+            raise ValueError(
+                f"marking has {len(marking)} places, net has {len(entry.pn.place_ids)}"
+            )
+        for pid, value, bound in zip(entry.pn.place_ids, marking, entry.pn.bounds):
+            if not 0 <= value <= bound:
+                raise ValueError(
+                    f"place {pid} holds {value} tokens, outside [0, {int(bound)}]"
+                )
+
+        bdd = entry.reachable_bdd()
+        with _BDD_LOCK:
+            assignment = marking_assignment(place_bdd_vars(entry.pn), marking)
+            return {"reachable": bdd.restrict(assignment).is_one()}
+
+    def _deadlock(self, request):
+        entry = self._entry(request)
+        bdd = entry.reachable_bdd()
+
+        def compute():
+            from src.DeadLock import check_deadlock
+
+            return check_deadlock(entry.pn, bdd, bdd_lock=_BDD_LOCK)
+
+        return {"deadlock": entry.answer("deadlock", compute)}
+
+    def _optimize(self, request):
+        entry = self._entry(request)
+        c = tuple(float(x) for x in request["c"])
+        if len(c) != len(entry.pn.place_ids):
+            raise ValueError(
+                f"c has {len(c)} entries, net has {len(entry.pn.place_ids)} places"
+            )
+
+        bdd = entry.reachable_bdd()
+
+        def compute():
+            from src.Optimization import max_reachable_marking
+
+            with _BDD_LOCK:
+                return max_reachable_marking(
+                    entry.pn.place_ids, bdd, np.array(c), entry.pn.bounds
+                )
+
+        marking, value = entry.answer(("optimize", c), compute)
+        return {"marking": marking, "value": value}
+
+    def serve_stream(self, reader, writer) -> None:
+        """Read JSON lines from `reader`, answer them concurrently on `writer`."""
+        write_lock = threading.Lock()
+
+        def answer(line: str) -> None:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                reply = {"id": None, "error": f"bad request: {e}"}
+            else:
+                reply = self.handle(request)
+            with write_lock:
+                writer.write(json.dumps(reply) + "\n")
+                writer.flush()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for line in reader:
+                if line.strip():
+                    pool.submit(answer, line)
+
+    def serve_unix(self, path: str) -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(path)
+            server.listen()
+            print(f"[Server] Listening on {path}", file=sys.stderr)
+            while True:
+                conn, _ = server.accept()
+                threading.Thread(
+                    target=self._serve_connection, args=(conn,), daemon=True
+                ).start()
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        with conn, conn.makefile("r") as reader, conn.makefile("w") as writer:
+            self.serve_stream(reader, writer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Petri net analysis server")
+    parser.add_argument("--socket", help="serve on this Unix socket instead of stdio")
+    parser.add_argument("--cache-size", type=int, default=8, help="nets kept warm")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent requests")
+    args = parser.parse_args()
+
+    server = AnalysisServer(cache_size=args.cache_size, workers=args.workers)
+
+    # The analysis code prints progress to stdout; keep the protocol channel clean
+    protocol_out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.socket:
+            server.serve_unix(args.socket)
+        else:
+            server.serve_stream(sys.stdin, protocol_out)
+
+
+if __name__ == "__main__":
+    main()